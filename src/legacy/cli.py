@@ -6,14 +6,19 @@ Usage:
     python -m src.legacy.cli "D:/path/to/sunat/files" --output_format csv
 """
 import argparse
+import hashlib
+import os
 import sys
+from concurrent.futures import Future
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, Tuple, Optional, Pattern, List
+from typing import Dict, Iterator, Tuple, Optional, Pattern, List, Type
 
 import pandas as pd
 
 # Legacy imports - adapted to new structure
 from src.utils.logger import setup_logger
+from src.utils.process_pool import create_process_pool, process_file_in_worker
 from src.utils.db_manager import DatabaseManager
 from src.processors.factura_processor import FacturaProcessor
 from src.processors.nota_credito_processor import NotaCreditoProcessor
@@ -28,29 +33,105 @@ from src.core.document_rules import DOCUMENT_RULES, identify_document_type
 from src.config import get_settings
 
 
-def process_directory(input_path: Path, output_path: Path, logger, output_format: str, db_manager: DatabaseManager = None):
+PROCESSOR_CLASSES: Dict[str, Type[BaseDocumentProcessor]] = {
+    'factura_xml': FacturaProcessor,
+    'sire_compras': SireComprasProcessor,
+    'sire_ventas': SireVentasProcessor,
+    'reporte_planilla_zip': PlanillaProcessor,
+}
+
+
+def _iter_files(root: str, logger) -> Iterator[os.DirEntry]:
+    # scandir entrega el tipo de cada entrada junto con su nombre: sin un stat() extra por archivo.
+    # Los enlaces simbólicos a directorios no se recorren: evita ciclos y no visita dos veces el mismo árbol
+    subdirs = []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    yield entry
+                elif entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+    except OSError as e:
+        logger.error(f"No se pudo leer el directorio {root}: {e}")
+    for subdir in subdirs:
+        yield from _iter_files(subdir, logger)
+
+
+def _find_duplicates(pending: List[Tuple[os.DirEntry, str]]) -> Dict[int, int]:
+    """Índice de cada archivo byte a byte idéntico a uno anterior del mismo tipo -> índice de ese original"""
+    # Solo se leen y hashean los archivos cuyo tamaño coincide con el de otro: el resto no puede repetirse
+    by_size: Dict[Tuple[str, int], List[int]] = {}
+    for index, (file_path, doc_type) in enumerate(pending):
+        by_size.setdefault((doc_type, file_path.stat().st_size), []).append(index)
+
+    duplicates = {}
+    for indices in by_size.values():
+        if len(indices) < 2:
+            continue
+        first_by_digest: Dict[bytes, int] = {}
+        for index in indices:
+            with open(pending[index][0].path, 'rb') as f:
+                digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=16)).digest()
+            original = first_by_digest.setdefault(digest, index)
+            if original != index:
+                duplicates[index] = original
+    return duplicates
+
+
+def _run_inline(processor: BaseDocumentProcessor, file_path: str) -> Future:
+    """Procesa file_path en este proceso y deja el resultado (o la excepción) en un Future ya resuelto"""
+    future = Future()
+    try:
+        future.set_result(processor.process_file(file_path))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
+def process_directory(input_path: Path, output_path: Path, logger, output_format: str, db_manager: DatabaseManager = None,
+                      max_workers: Optional[int] = None):
     processors: Dict[str, BaseDocumentProcessor] = {
-        'factura_xml': FacturaProcessor(logger),
-        'sire_compras': SireComprasProcessor(logger),
-        'sire_ventas': SireVentasProcessor(logger),
-        'reporte_planilla_zip': PlanillaProcessor(logger),
+        doc_type: processor_cls(logger) for doc_type, processor_cls in PROCESSOR_CLASSES.items()
     }
 
     all_results = []
     stats = {'total_files': 0, 'processed_files': 0, 'errors': 0, 'unknown_files': 0, 'by_type': {}}
     error_details = []
 
-    all_files = [p for p in input_path.glob('**/*') if p.is_file()]
-    stats['total_files'] = len(all_files)
-
-    for file_path in all_files:
+    pending = []
+    for file_path in _iter_files(str(input_path), logger):
+        stats['total_files'] += 1
         doc_type = identify_document_type(file_path.name)
         stats['by_type'][doc_type] = stats['by_type'].get(doc_type, 0) + 1
+        if doc_type in processors:
+            pending.append((file_path, doc_type))
+        else:
+            logger.warning(f"No hay procesador para '{doc_type}': {file_path.name}")
+            stats['unknown_files'] += 1
 
-        processor = processors.get(doc_type)
-        if processor:
+    # Los reenvíos idénticos no se vuelven a parsear: reutilizan el resultado de su original
+    duplicates = _find_duplicates(pending)
+    for index, original in duplicates.items():
+        logger.info(f"Archivo {pending[index][0].name} idéntico a {pending[original][0].name}: se reutiliza su resultado.")
+
+    # Cada archivo es independiente y su parseo es CPU-bound: se reparte entre procesos, un archivo por tarea.
+    # Con un solo archivo que parsear no compensa arrancar procesos: se procesa en este mismo proceso
+    originals = [index for index in range(len(pending)) if index not in duplicates]
+    pool = create_process_pool(logger, len(originals), max_workers) if len(originals) > 1 else nullcontext()
+    with pool as executor:
+        futures = {}
+        for index in originals:
+            file_path, doc_type = pending[index]
+            if executor is None:
+                futures[index] = _run_inline(processors[doc_type], file_path.path)
+            else:
+                futures[index] = executor.submit(process_file_in_worker, PROCESSOR_CLASSES[doc_type], file_path.path,
+                                                 logger.name)
+        for index, (file_path, doc_type) in enumerate(pending):
+            processor = processors[doc_type]
             try:
-                result_dict = processor.process_file(str(file_path))
+                result_dict = futures[duplicates.get(index, index)].result()
                 if result_dict:
                     all_results.append({'processor': processor, 'data': result_dict})
                     stats['processed_files'] += 1
@@ -69,9 +150,9 @@ def process_directory(input_path: Path, output_path: Path, logger, output_format
                     'tipo_documento': doc_type,
                     'error': str(e)
                 })
-        else:
-            logger.warning(f"No hay procesador para '{doc_type}': {file_path.name}")
-            stats['unknown_files'] += 1
+
+    # Un único sello de tiempo para todos los reportes de esta ejecución
+    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
 
     if output_format == 'csv':
         results_flat = {}
@@ -81,14 +162,14 @@ def process_directory(input_path: Path, output_path: Path, logger, output_format
                     if key not in results_flat:
                         results_flat[key] = []
                     results_flat[key].append(df)
-        save_results_to_csv(results_flat, output_path, logger)
+        save_results_to_csv(results_flat, output_path, logger, timestamp)
 
     elif output_format == 'database' and db_manager:
         save_results_to_db(all_results, db_manager, logger)
 
     if error_details:
         errors_df = pd.DataFrame(error_details)
-        errors_file = output_path / f'errores_{pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        errors_file = output_path / f'errores_{timestamp}.csv'
         errors_df.to_csv(errors_file, index=False, encoding='utf-8')
         logger.info(f"Reporte de errores generado: {errors_file}")
 
@@ -99,18 +180,19 @@ def process_directory(input_path: Path, output_path: Path, logger, output_format
         'Desconocidos': stats['unknown_files'],
         **{f'Total_{k}': v for k, v in stats['by_type'].items()}
     }])
-    stats_file = output_path / f'estadisticas_{pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    stats_file = output_path / f'estadisticas_{timestamp}.csv'
     stats_df.to_csv(stats_file, index=False, encoding='utf-8')
     logger.info(f"Reporte de estadísticas generado: {stats_file}")
 
 
-def save_results_to_csv(results: Dict[str, List[pd.DataFrame]], output_path: Path, logger):
-    timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
+def save_results_to_csv(results: Dict[str, List[pd.DataFrame]], output_path: Path, logger, timestamp: Optional[str] = None):
+    if timestamp is None:
+        timestamp = pd.Timestamp.now().strftime("%Y%m%d_%H%M%S")
     for key, df_list in results.items():
         if df_list:
             non_empty_dfs = [df for df in df_list if not df.empty]
             if non_empty_dfs:
-                final_df = pd.concat(non_empty_dfs, ignore_index=True)
+                final_df = pd.concat(non_empty_dfs, ignore_index=True, copy=False, sort=False)
                 output_file = output_path / f'resultados_{key}_{timestamp}.csv'
                 final_df.to_csv(output_file, index=False, encoding='utf-8')
                 logger.info(f"Reporte CSV '{key}' generado con {len(final_df)} filas.")
@@ -152,7 +234,7 @@ def save_results_to_db(all_results: List[Dict], db: DatabaseManager, logger):
         if not group['dfs']:
             continue
 
-        full_df = pd.concat(group['dfs'], ignore_index=True)
+        full_df = pd.concat(group['dfs'], ignore_index=True, copy=False, sort=False)
         columns = group['columns']
         db.insert_dataframe(full_df, schema, table, columns)
 
@@ -162,8 +244,12 @@ def main():
     parser.add_argument('input_dir', type=str, help='Directorio con los archivos a procesar.')
     parser.add_argument('--output_dir', type=str, default='output', help='Directorio para los resultados.')
     parser.add_argument('--output_format', type=str, choices=['csv', 'database'], default='csv', help="Formato de salida.")
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Procesos en paralelo (por defecto, uno por CPU).')
     
     args = parser.parse_args()
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers debe ser un entero positivo.')
     
     script_dir = Path(__file__).resolve().parent.parent.parent
     input_path = Path(args.input_dir)
@@ -190,7 +276,7 @@ def main():
             logger.error(f"No se pudo iniciar la conexión a la base de datos: {e}. Abortando.")
             sys.exit(1)
 
-    process_directory(input_path, output_path, logger, args.output_format, db_manager)
+    process_directory(input_path, output_path, logger, args.output_format, db_manager, max_workers=args.workers)
     
     if db_manager:
         db_manager.disconnect()
@@ -87,4 +87,5 @@ class BaseDocumentProcessor(ABC):
 
     def log_operation(self, operation: str, status: str, details: str, level: int = logging.INFO):
         """Log a structured operation record."""
-        self.logger.log(level, f"Operación: {operation} - Estado: {status} - Detalles: {details}")
\ No newline at end of file
+        # Lazy %-formatting: the message is only built if the level is enabled
+        self.logger.log(level, "Operación: %s - Estado: %s - Detalles: %s", operation, status, details)
\ No newline at end of file
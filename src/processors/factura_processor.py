@@ -13,7 +13,7 @@ import pandas as pd
 import xml.etree.ElementTree as ET
 
 from .base_processor import BaseDocumentProcessor
-from src.utils.xml_utils import get_xml_encoding
+from src.utils.xml_utils import detect_xml_encoding
 from src.utils.cui_generator import build_cui_comprobante
 
 
@@ -97,9 +97,10 @@ class FacturaProcessor(BaseDocumentProcessor):
 
             if file_path.lower().endswith('.zip'):
                 with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    xml_filename = next((name for name in zip_ref.namelist() if name.lower().endswith('.xml')), None)
-                    if xml_filename:
-                        with zip_ref.open(xml_filename) as f:
+                    xml_info = next((info for info in zip_ref.infolist()
+                                     if not info.is_dir() and info.filename.lower().endswith('.xml')), None)
+                    if xml_info:
+                        with zip_ref.open(xml_info) as f:
                             content_bytes = f.read()
                             try:
                                 xml_content = content_bytes.decode('utf-8')
@@ -109,9 +110,10 @@ class FacturaProcessor(BaseDocumentProcessor):
                         self.logger.warning(f"El archivo ZIP {file_name} no contiene ningún XML.")
                         return None
             else:
-                encoding = get_xml_encoding(file_path)
-                with open(file_path, 'r', encoding=encoding) as f:
-                    xml_content = f.read()
+                # Una sola lectura: el encoding se detecta sobre los mismos bytes que luego se decodifican
+                with open(file_path, 'rb') as f:
+                    content_bytes = f.read()
+                xml_content = content_bytes.decode(detect_xml_encoding(content_bytes))
 
             if xml_content is None:
                 return None
@@ -133,9 +135,10 @@ class FacturaProcessor(BaseDocumentProcessor):
             # Case 1: ZIP file - extract XML from bytes
             if file_name.lower().endswith('.zip'):
                 with zipfile.ZipFile(io.BytesIO(file_content), 'r') as zip_ref:
-                    xml_filename = next((name for name in zip_ref.namelist() if name.lower().endswith('.xml')), None)
-                    if xml_filename:
-                        with zip_ref.open(xml_filename) as f:
+                    xml_info = next((info for info in zip_ref.infolist()
+                                     if not info.is_dir() and info.filename.lower().endswith('.xml')), None)
+                    if xml_info:
+                        with zip_ref.open(xml_info) as f:
                             content_bytes = f.read()
                             try:
                                 xml_content = content_bytes.decode('utf-8')
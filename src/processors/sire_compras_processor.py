@@ -2,65 +2,80 @@ import os
 import io
 import zipfile
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 import numpy as np
 import pandas as pd
 from typing import Optional, Dict, List
 
 from .base_processor import BaseDocumentProcessor
-from src.utils.cui_generator import build_cui_sire
+from src.utils.cui_generator import build_cui_sire_vectorized
 
 
 class SireComprasProcessor(BaseDocumentProcessor):
+    # Columnas de baja cardinalidad: se leen como 'category' para no materializar un objeto str por fila
+    CATEGORY_COLUMNS = ('Tipo CP/Doc.', 'Moneda', 'Tipo Doc Identidad', 'Tipo CP Modificado')
+    READ_BUFFER_SIZE = 1 << 20
+    MAX_ZIP_WORKERS = 8
+
+    RENAME_MAP = {
+        'RUC': 'ruc',
+        'Apellidos y Nombres o Razón social': 'razon_receptor',
+        'Periodo': 'periodo_tributario',
+        'CAR SUNAT': 'observaciones',
+        'Fecha de emisión': 'fecha_emision',
+        'Fecha Vcto/Pago': 'fecha_vencimiento',
+        'Tipo CP/Doc.': 'tipo_comprobante',
+        'Serie del CDP': 'numero_serie',
+        'Año': 'ano',
+        'Nro CP o Doc. Nro Inicial (Rango)': 'numero_correlativo',
+        'Nro Final (Rango)': 'numero_final',
+        'Tipo Doc Identidad': 'tipo_documento',
+        'Nro Doc Identidad': 'numero_documento',
+        'Apellidos Nombres/ Razón  Social': 'nombre_razon',
+        'BI Gravado DG': 'bi_gravado_dg',
+        'IGV / IPM DG': 'igv_gravado_dg',
+        'BI Gravado DGNG': 'bi_gravado_dgng',
+        'IGV / IPM DGNG': 'igv_gravado_dgng',
+        'BI Gravado DNG': 'bi_gravado_dng',
+        'IGV / IPM DNG': 'igv_gravado_dng',
+        'Valor Adq. NG': 'valor_adq_ng',
+        'ISC': 'isc',
+        'ICBPER': 'icbp',
+        'Otros Trib/ Cargos': 'otros_cargos',
+        'Total CP': 'importe_total',
+        'Moneda': 'tipo_moneda',
+        'Tipo de Cambio': 'tipo_cambio',
+        'Fecha Emisión Doc Modificado': 'fecha_comprobante_modificado',
+        'Tipo CP Modificado': 'tipo_comprobante_modificado',
+        'Serie CP Modificado': 'numero_serie_modificado',
+        'COD. DAM O DSI': 'dam',
+        'Nro CP Modificado': 'numero_correlativo_modificado',
+        'Clasif de Bss y Sss': 'clasificacion_bienes_servicios',
+        'ID Proyecto Operadores': 'proyecto_operadores',
+        'PorcPart': 'porc_part',
+        'IMB': 'imb',
+        'CAR Orig/ Ind E o I': 'car_original',
+        'Detracción': 'detraccion',
+        'Tipo de Nota': 'tipo_nota',
+        'Est. Comp.': 'estado_comprobante',
+        'Incal': 'incal'
+    }
+    FINAL_COLUMNS = tuple(RENAME_MAP.values()) + ('cui',)
+    _FINAL_COLS_INDEX = pd.Index(FINAL_COLUMNS)
+    _DB_MAPPING = {
+        'sire_compras': {
+            'table': 'stg_sire_compras',
+            'schema': 'meta',
+            'columns': {col: col for col in FINAL_COLUMNS},
+        }
+    }
+
     def __init__(self, logger: logging.Logger):
         super().__init__(logger)
-        self.RENAME_MAP = {
-            'RUC': 'ruc',
-            'Apellidos y Nombres o Razón social': 'razon_receptor',
-            'Periodo': 'periodo_tributario',
-            'CAR SUNAT': 'observaciones',
-            'Fecha de emisión': 'fecha_emision',
-            'Fecha Vcto/Pago': 'fecha_vencimiento',
-            'Tipo CP/Doc.': 'tipo_comprobante',
-            'Serie del CDP': 'numero_serie',
-            'Año': 'ano',
-            'Nro CP o Doc. Nro Inicial (Rango)': 'numero_correlativo',
-            'Nro Final (Rango)': 'numero_final',
-            'Tipo Doc Identidad': 'tipo_documento',
-            'Nro Doc Identidad': 'numero_documento',
-            'Apellidos Nombres/ Razón  Social': 'nombre_razon',
-            'BI Gravado DG': 'bi_gravado_dg',
-            'IGV / IPM DG': 'igv_gravado_dg',
-            'BI Gravado DGNG': 'bi_gravado_dgng',
-            'IGV / IPM DGNG': 'igv_gravado_dgng',
-            'BI Gravado DNG': 'bi_gravado_dng',
-            'IGV / IPM DNG': 'igv_gravado_dng',
-            'Valor Adq. NG': 'valor_adq_ng',
-            'ISC': 'isc',
-            'ICBPER': 'icbp',
-            'Otros Trib/ Cargos': 'otros_cargos',
-            'Total CP': 'importe_total',
-            'Moneda': 'tipo_moneda',
-            'Tipo de Cambio': 'tipo_cambio',
-            'Fecha Emisión Doc Modificado': 'fecha_comprobante_modificado',
-            'Tipo CP Modificado': 'tipo_comprobante_modificado',
-            'Serie CP Modificado': 'numero_serie_modificado',
-            'COD. DAM O DSI': 'dam',
-            'Nro CP Modificado': 'numero_correlativo_modificado',
-            'Clasif de Bss y Sss': 'clasificacion_bienes_servicios',
-            'ID Proyecto Operadores': 'proyecto_operadores',
-            'PorcPart': 'porc_part',
-            'IMB': 'imb',
-            'CAR Orig/ Ind E o I': 'car_original',
-            'Detracción': 'detraccion',
-            'Tipo de Nota': 'tipo_nota',
-            'Est. Comp.': 'estado_comprobante',
-            'Incal': 'incal'
-        }
-        self.FINAL_COLUMNS = list(self.RENAME_MAP.values()) + ['cui']
 
     def get_db_mapping(self) -> Dict[str, Dict]:
-        final_mapping = {col: col for col in self.FINAL_COLUMNS}
-        return {'sire_compras': {'table': 'stg_sire_compras', 'schema': 'meta', 'columns': final_mapping}}
+        return self._DB_MAPPING
 
     def process_file(self, file_path: str) -> Optional[Dict[str, pd.DataFrame]]:
         file_name = os.path.basename(file_path)
@@ -99,15 +114,9 @@ class SireComprasProcessor(BaseDocumentProcessor):
         all_dfs = []
         try:
             if file_path.lower().endswith('.zip'):
-                with zipfile.ZipFile(file_path, 'r') as zip_ref:
-                    for name in zip_ref.namelist():
-                        if name.lower().endswith('.txt'):
-                            with zip_ref.open(name) as file:
-                                df = self._read_txt_content(file)
-                                if df is not None:
-                                    all_dfs.append(df)
+                all_dfs.extend(self._read_zip_entries(file_path))
             elif file_path.lower().endswith('.txt'):
-                with open(file_path, 'rb') as file:
+                with open(file_path, 'rb', buffering=self.READ_BUFFER_SIZE) as file:
                     df = self._read_txt_content(file)
                     if df is not None:
                         all_dfs.append(df)
@@ -115,7 +124,9 @@ class SireComprasProcessor(BaseDocumentProcessor):
                 return None
             if not all_dfs:
                 return pd.DataFrame()
-            return pd.concat(all_dfs, ignore_index=True)
+            if len(all_dfs) == 1:
+                return all_dfs[0]
+            return pd.concat(all_dfs, ignore_index=True, copy=False)
         except Exception as e:
             self.logger.error(f"Error en extracción de {file_path}: {e}", exc_info=True)
             return None
@@ -124,13 +135,7 @@ class SireComprasProcessor(BaseDocumentProcessor):
         all_dfs = []
         try:
             if file_name.lower().endswith('.zip'):
-                with zipfile.ZipFile(io.BytesIO(file_content), 'r') as zip_ref:
-                    for name in zip_ref.namelist():
-                        if name.lower().endswith('.txt'):
-                            with zip_ref.open(name) as file:
-                                df = self._read_txt_content(file)
-                                if df is not None:
-                                    all_dfs.append(df)
+                all_dfs.extend(self._read_zip_entries(file_content))
             elif file_name.lower().endswith('.txt'):
                 df = self._read_txt_content(io.BytesIO(file_content))
                 if df is not None:
@@ -139,27 +144,60 @@ class SireComprasProcessor(BaseDocumentProcessor):
                 return None
             if not all_dfs:
                 return pd.DataFrame()
-            return pd.concat(all_dfs, ignore_index=True)
+            if len(all_dfs) == 1:
+                return all_dfs[0]
+            return pd.concat(all_dfs, ignore_index=True, copy=False)
         except Exception as e:
             self.logger.error(f"Error en extracción de {file_name}: {e}", exc_info=True)
             return None
 
+    def _read_zip_entries(self, source) -> List[pd.DataFrame]:
+        """source: ruta del ZIP o su contenido en bytes"""
+        with zipfile.ZipFile(self._zip_source(source), 'r') as zip_ref:
+            names = [name for name in zip_ref.namelist() if name.lower().endswith('.txt')]
+            if len(names) <= 1:
+                dfs = [self._read_zip_entry(zip_ref, name) for name in names]
+                return [df for df in dfs if df is not None]
+        # zlib libera el GIL: la descompresión de varios TXT se solapa entre hilos. Cada tarea abre su propio
+        # ZipFile, porque sobre un handle compartido el lock interno de zipfile serializa las lecturas
+        with ThreadPoolExecutor(max_workers=min(len(names), self.MAX_ZIP_WORKERS, os.cpu_count() or 1)) as executor:
+            dfs = list(executor.map(self._read_zip_entry_isolated, repeat(source), names))
+        return [df for df in dfs if df is not None]
+
+    def _read_zip_entry_isolated(self, source, name: str) -> Optional[pd.DataFrame]:
+        with zipfile.ZipFile(self._zip_source(source), 'r') as zip_ref:
+            return self._read_zip_entry(zip_ref, name)
+
+    @staticmethod
+    def _zip_source(source):
+        # BytesIO sobre un objeto bytes no copia el contenido: cada ZipFile en memoria comparte el mismo buffer
+        return io.BytesIO(source) if isinstance(source, bytes) else source
+
+    def _read_zip_entry(self, zip_ref: zipfile.ZipFile, name: str) -> Optional[pd.DataFrame]:
+        with zip_ref.open(name) as raw, io.BufferedReader(raw, buffer_size=self.READ_BUFFER_SIZE) as file:
+            return self._read_txt_content(file)
+
     def _read_txt_content(self, file_obj) -> Optional[pd.DataFrame]:
         try:
             content_bytes = file_obj.read()
-            try:
-                content = content_bytes.decode('utf-8-sig')
-            except UnicodeDecodeError:
-                content = content_bytes.decode('latin-1', errors='replace')
-            
-            lines = content.splitlines()
-            if len(lines) < 2:
+            header_end = content_bytes.find(b'\n')
+            if header_end == -1:
                 return None
-            
-            header = [h.strip() for h in lines[0].split('|')]
-            data = io.StringIO('\n'.join(lines[1:]))
-            df = pd.read_csv(data, sep='|', header=None, names=header, dtype=str)
-            return df
+
+            # Solo se decodifica el encabezado; el cuerpo lo lee el parser C directamente desde los bytes
+            for encoding in ('utf-8-sig', 'latin-1'):
+                try:
+                    header = [h.strip() for h in content_bytes[:header_end].decode(encoding).split('|')]
+                    dtypes = {h: ('category' if h in self.CATEGORY_COLUMNS else str) for h in header}
+                    df = pd.read_csv(io.BytesIO(content_bytes), sep='|', header=None, names=header, skiprows=1,
+                                     dtype=dtypes, encoding=encoding, engine='c',
+                                     keep_default_na=False, na_values=[''])
+                    break
+                except UnicodeDecodeError:
+                    continue
+                except pd.errors.EmptyDataError:
+                    return None
+            return df if not df.empty else None
         except Exception as e:
             self.logger.error(f"Error leyendo contenido de archivo TXT: {e}")
             return None
@@ -195,68 +233,86 @@ class SireComprasProcessor(BaseDocumentProcessor):
         self._aplicar_filtro_complejo(df)
         self._convert_data_types(df)
         
-        df['cui'] = df.apply(
-            lambda row: build_cui_sire(
-                row.get('ruc'),
-                row.get('tipo_comprobante'),
-                row.get('numero_serie'),
-                row.get('numero_correlativo')
-            ), axis=1)
+        cui_columns = ['ruc', 'tipo_comprobante', 'numero_serie', 'numero_correlativo']
+        if all(col in df.columns for col in cui_columns):
+            df['cui'] = build_cui_sire_vectorized(*(df[col] for col in cui_columns))
+        else:
+            df['cui'] = None
         
-        final_df = df[[col for col in self.FINAL_COLUMNS if col in df.columns]].copy()
+        final_df = df.reindex(columns=self._FINAL_COLS_INDEX, copy=False)
         return final_df
 
     def _aplicar_filtro_complejo(self, df: pd.DataFrame) -> None:
         columnas_valor = ['bi_gravado_dg', 'igv_gravado_dg', 'bi_gravado_dgng', 'igv_gravado_dgng',
                           'bi_gravado_dng', 'igv_dng', 'valor_adq_ng', 'otros_cargos']
-        for col in columnas_valor:
-            if col not in df.columns:
-                df[col] = 0
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        valores = df.reindex(columns=columnas_valor, fill_value=0)
+        df[columnas_valor] = valores.apply(pd.to_numeric, errors='coerce').fillna(0)
         
-        cond_destino_5 = ((df['bi_gravado_dg'] > 0) | (df['bi_gravado_dgng'] > 0) | (df['bi_gravado_dng'] > 0)) & (df['valor_adq_ng'] > 0)
-        cond_destino_1 = (df['bi_gravado_dg'] > 0)
-        cond_destino_2 = (df['bi_gravado_dgng'] > 0)
-        cond_destino_3 = (df['bi_gravado_dng'] > 0)
-        cond_destino_4 = (df['valor_adq_ng'] > 0)
+        bi_dg = df['bi_gravado_dg'].to_numpy()
+        bi_dgng = df['bi_gravado_dgng'].to_numpy()
+        bi_dng = df['bi_gravado_dng'].to_numpy()
+        val_ng = df['valor_adq_ng'].to_numpy()
+        igv_dg = df['igv_gravado_dg'].to_numpy()
+        igv_dgng = df['igv_gravado_dgng'].to_numpy()
+        igv_dng = df['igv_dng'].to_numpy()
+
+        cond_destino_1 = bi_dg > 0
+        cond_destino_2 = bi_dgng > 0
+        cond_destino_3 = bi_dng > 0
+        cond_destino_4 = val_ng > 0
+        if not (cond_destino_1.any() or cond_destino_2.any() or cond_destino_3.any() or cond_destino_4.any()):
+            # Periodo sin bases imponibles: todas las filas caen en el destino por defecto
+            df['destino'] = 0
+            df['valor'] = 0.0
+            df['igv'] = 0.0
+            df['tipo_operacion'] = 2
+            return
+        cond_destino_5 = (cond_destino_1 | cond_destino_2 | cond_destino_3) & cond_destino_4
         condiciones = [cond_destino_5, cond_destino_1, cond_destino_2, cond_destino_3, cond_destino_4]
         
-        resultados_destino = [5, 1, 2, 3, 4]
-        resultados_valor = [df['bi_gravado_dg'] + df['bi_gravado_dgng'] + df['bi_gravado_dng'], df['bi_gravado_dg'], df['bi_gravado_dgng'], df['bi_gravado_dng'], df['valor_adq_ng']]
-        resultados_igv = [df['igv_gravado_dg'] + df['igv_gravado_dgng'] + df['igv_dng'], df['igv_gravado_dg'], df['igv_gravado_dgng'], df['igv_dng'], 0]
-        resultados_otros = [df['otros_cargos'] + df['valor_adq_ng'], df['otros_cargos'], df['otros_cargos'], df['otros_cargos'], df['otros_cargos']]
+        # Una sola pasada de np.select decide la rama de cada fila; las salidas se recogen por índice
+        rama = np.select(condiciones, np.arange(len(condiciones)), default=len(condiciones))
+
+        resultados_destino = np.array([5, 1, 2, 3, 4, 0])
+        resultados_valor = [bi_dg + bi_dgng + bi_dng, bi_dg, bi_dgng, bi_dng, val_ng, 0]
+        resultados_igv = [igv_dg + igv_dgng + igv_dng, igv_dg, igv_dgng, igv_dng, 0, 0]
         
-        df['destino'] = np.select(condiciones, resultados_destino, default=0)
-        df['valor'] = np.select(condiciones, resultados_valor, default=0)
-        df['igv'] = np.select(condiciones, resultados_igv, default=0)
+        df['destino'] = resultados_destino[rama]
+        df['valor'] = np.choose(rama, resultados_valor)
+        df['igv'] = np.choose(rama, resultados_igv)
         df['tipo_operacion'] = 2
 
-    def _convert_data_types(self, df: pd.DataFrame) -> None:
-        if 'ruc' in df.columns:
-            df['ruc'] = pd.to_numeric(df['ruc'], errors='coerce').astype('Int64')
+    @staticmethod
+    def _parse_dates_cached(col: pd.Series, fmt: str) -> pd.Series:
+        """Parsea fechas con fmt y devuelve una Series datetime64[ns] (NaT si vacía o inválida)."""
+        # Un SIRE repite pocas fechas distintas: se parsean solo los valores únicos y se reexpanden por código
+        codes, unicos = pd.factorize(col)
+        fechas = pd.to_datetime(unicos, format=fmt, errors='coerce', cache=True)
+        return pd.Series(fechas.take(codes, allow_fill=True, fill_value=pd.NaT), index=col.index)
 
-        int_columns = ['periodo_tributario', 'tipo_comprobante', 'destino', 'ano', 'numero_final', 'tipo_documento', 'tipo_comprobante_modificado']
-        for col in int_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').astype('Int64')
+    def _convert_data_types(self, df: pd.DataFrame) -> None:
+        int_columns = ['ruc', 'periodo_tributario', 'tipo_comprobante', 'destino', 'ano', 'numero_final', 'tipo_documento', 'tipo_comprobante_modificado']
+        int_cols_present = [col for col in int_columns if col in df.columns]
+        if int_cols_present:
+            df[int_cols_present] = df[int_cols_present].apply(pd.to_numeric, errors='coerce').astype('Int64')
 
         date_columns = ['fecha_emision', 'fecha_vencimiento', 'fecha_comprobante_modificado']
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], format='%d/%m/%Y', errors='coerce').dt.date
+        date_cols_present = [col for col in date_columns if col in df.columns]
+        if date_cols_present:
+            df[date_cols_present] = df[date_cols_present].apply(self._parse_dates_cached, fmt='%d/%m/%Y')
 
         varchar_columns = ['numero_serie', 'numero_correlativo', 'numero_documento', 'nombre_receptor', 'nombre_razon', 
                            'tipo_moneda', 'numero_serie_modificado', 'numero_correlativo_modificado', 'dam', 
                            'clasificacion_bienes_servicios', 'proyecto_operadores', 'car_original', 'tipo_nota', 
                            'estado_comprobante', 'incal', 'cui']
-        for col in varchar_columns:
-            if col in df.columns:
-                df[col] = df[col].astype(str)
-                df.loc[df[col] == 'nan', col] = np.nan
+        varchar_cols_present = [col for col in varchar_columns
+                                if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)]
+        if varchar_cols_present:
+            df[varchar_cols_present] = df[varchar_cols_present].astype('string')
 
         numeric_columns = ['bi_gravado_dg', 'igv_gravado_dg', 'bi_gravado_dgng', 'igv_gravado_dgng', 'bi_gravado_dng', 
                            'igv_dng', 'valor_adq_ng', 'isc', 'icbp', 'otros_cargos', 'importe_total', 'tipo_cambio', 
                            'porc_part', 'imb', 'detraccion', 'valor', 'igv']
-        for col in numeric_columns:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
\ No newline at end of file
+        num_cols_present = [col for col in numeric_columns if col in df.columns]
+        if num_cols_present:
+            df[num_cols_present] = df[num_cols_present].apply(pd.to_numeric, errors='coerce').round(2)
\ No newline at end of file
@@ -7,14 +7,42 @@ that is safe for concurrent access via ThreadPoolExecutor.
 The legacy check_records_exist() method has been removed per ARCHITECTURE_BLUEPRINT:
 the database handles duplicate detection in later stages.
 """
+import csv
+import io
 import logging
 import pandas as pd
 from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine
-from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.exc import DBAPIError, SQLAlchemyError
 from typing import Optional, List, Dict
 
 
+def _copy_from_stdin(table, conn, keys, data_iter):
+    """
+    pandas.to_sql insertion method that streams each chunk through PostgreSQL COPY.
+
+    Rows are serialized to CSV in memory and loaded with a single COPY ... FROM STDIN,
+    avoiding the per-statement round trips and parameter binding of multi-row INSERTs.
+    NULLs are written as \\N so empty strings keep their value. Driver errors are
+    re-raised as SQLAlchemy's DBAPIError, like any other statement on the engine.
+    """
+    import psycopg2  # Only PostgreSQL engines use this method
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows([r"\N" if value is None else value for value in row] for row in data_iter)
+    buffer.seek(0)
+
+    columns = ", ".join(f'"{key}"' for key in keys)
+    table_name = f'"{table.schema}"."{table.name}"' if table.schema else f'"{table.name}"'
+    statement = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    try:
+        with conn.connection.cursor() as cursor:
+            cursor.copy_expert(statement, buffer)
+    except psycopg2.Error as e:
+        raise DBAPIError.instance(statement, None, e, psycopg2.Error) from e
+
+
 class DatabaseManager:
     """
     Thread-safe database manager using SQLAlchemy connection pooling.
@@ -23,6 +51,9 @@ class DatabaseManager:
     To be used with concurrent.futures.ThreadPoolExecutor.
     """
 
+    # Rows per COPY statement; each chunk is buffered as CSV in memory before sending
+    COPY_CHUNKSIZE = 50000
+
     def __init__(self, db_uri: str, logger: Optional[logging.Logger] = None):
         """
         Initialize the database manager with a connection URI.
@@ -76,7 +107,10 @@ class DatabaseManager:
         column_mapping: Dict[str, str],
     ):
         """
-        Insert a DataFrame into a database table using bulk insert (method='multi').
+        Insert a DataFrame into a database table using PostgreSQL COPY FROM STDIN.
+
+        Falls back to multi-row INSERTs (method='multi') for engines whose DBAPI driver
+        is not psycopg2, since COPY goes through its cursor.copy_expert().
 
         This method does NOT check for existing records before inserting.
         Duplicate handling is delegated to the database layer (constraints, ON CONFLICT, etc.).
@@ -106,6 +140,11 @@ class DatabaseManager:
         existing_columns = [col for col in final_columns if col in df_to_load.columns]
         df_to_load = df_to_load[existing_columns]
 
+        if self.engine.dialect.driver == "psycopg2":
+            method, chunksize = _copy_from_stdin, self.COPY_CHUNKSIZE
+        else:
+            method, chunksize = "multi", 500
+
         try:
             df_to_load.to_sql(
                 name=table,
@@ -113,8 +152,8 @@ class DatabaseManager:
                 schema=schema,
                 if_exists="append",
                 index=False,
-                method="multi",  # Bulk insert for performance
-                chunksize=500,   # Insert 500 rows at a time
+                method=method,
+                chunksize=chunksize,
             )
             self.logger.info(
                 f"Se insertaron {len(df_to_load)} filas en la tabla "
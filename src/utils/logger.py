@@ -1,11 +1,22 @@
+import atexit
 import logging
+import multiprocessing
 import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
+
+# Cola compartida con los procesos worker: un único hilo listener escribe en archivo y consola
+_log_queue: Optional[multiprocessing.Queue] = None
+_listener: Optional[QueueListener] = None
+_setup_lock = threading.Lock()
 
 
 def setup_logger(log_path: Path) -> logging.Logger:
     """Configura y retorna un logger personalizado"""
+    global _log_queue, _listener
     
     # Crear el directorio de logs si no existe
     log_path.mkdir(parents=True, exist_ok=True)
@@ -14,31 +25,50 @@ def setup_logger(log_path: Path) -> logging.Logger:
     logger = logging.getLogger('parser_sunat')
     logger.setLevel(logging.INFO)
     
-    # Evitar duplicación de handlers
-    if not logger.handlers:
-        # Handler para archivo
-        log_file = log_path / f'process_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
-        fh = logging.FileHandler(log_file, encoding='utf-8')
-        fh.setLevel(logging.INFO)
+    # Evitar duplicación de handlers; el lock impide que dos hilos pasen a la vez el chequeo
+    with _setup_lock:
+        if not logger.handlers:
+            # Handler para archivo
+            log_file = log_path / f'process_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log'
+            fh = logging.FileHandler(log_file, encoding='utf-8')
+            fh.setLevel(logging.INFO)
         
-        # Handler para consola (stderr para visibilidad en Docker)
-        ch = logging.StreamHandler(sys.stderr)
-        ch.setLevel(logging.INFO)
+            # Handler para consola (stderr para visibilidad en Docker)
+            ch = logging.StreamHandler(sys.stderr)
+            ch.setLevel(logging.INFO)
         
-        # Formato
-        formatter = logging.Formatter(
-            '%(asctime)s - %(levelname)s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        fh.setFormatter(formatter)
-        ch.setFormatter(formatter)
+            # Formato
+            formatter = logging.Formatter(
+                '%(asctime)s - %(levelname)s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
+            fh.setFormatter(formatter)
+            ch.setFormatter(formatter)
+        
+            # Los registros pasan por una cola: los procesos worker no escriben directamente en el archivo
+            _log_queue = multiprocessing.Queue(-1)
+            _listener = QueueListener(_log_queue, fh, ch, respect_handler_level=True)
+            _listener.start()
+            atexit.register(_listener.stop)
         
-        logger.addHandler(fh)
-        logger.addHandler(ch)
+            logger.addHandler(QueueHandler(_log_queue))
     
     return logger
 
 
+def get_log_queue() -> Optional[multiprocessing.Queue]:
+    """Retorna la cola de logging creada por setup_logger, o None si no se configuró"""
+    return _log_queue
+
+
+def configure_worker_logger(log_queue: multiprocessing.Queue, name: str = 'parser_sunat'):
+    """Initializer de procesos worker: envía sus registros a la cola del proceso principal"""
+    logger = logging.getLogger(name)
+    logger.setLevel(logging.INFO)
+    # Reemplaza los handlers heredados por fork para no escribir dos veces
+    logger.handlers = [QueueHandler(log_queue)]
+
+
 def configure_root_logger():
     """
     Configure the root logger to ensure all loggers in the project
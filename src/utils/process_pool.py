@@ -0,0 +1,32 @@
+"""
+Pool de procesos compartido para procesar archivos en paralelo.
+
+Cada proceso worker reutiliza una instancia por clase de procesador y envía sus
+registros a la cola de logging del proceso principal (ver src.utils.logger).
+"""
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from src.utils.logger import configure_worker_logger, get_log_queue
+
+# Procesadores de cada proceso worker, creados una sola vez por (clase, logger)
+_worker_processors: Dict[Tuple[type, str], object] = {}
+
+
+def create_process_pool(logger: logging.Logger, n_tasks: int, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Crea el pool con a lo sumo un worker por tarea; los workers loguean a través de la cola de setup_logger"""
+    workers = max(min(n_tasks, max_workers or os.cpu_count() or 1), 1)
+    log_queue = get_log_queue()
+    pool_logging = {'initializer': configure_worker_logger, 'initargs': (log_queue, logger.name)} if log_queue else {}
+    return ProcessPoolExecutor(max_workers=workers, **pool_logging)
+
+
+def process_file_in_worker(processor_cls: type, file_path: str, logger_name: str):
+    """Tarea del pool: procesa file_path con la instancia de processor_cls cacheada en este worker"""
+    key = (processor_cls, logger_name)
+    processor = _worker_processors.get(key)
+    if processor is None:
+        processor = _worker_processors[key] = processor_cls(logging.getLogger(logger_name))
+    return processor.process_file(file_path)
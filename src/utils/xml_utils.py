@@ -1,6 +1,10 @@
 import re
 import codecs
 
+# La declaración XML va al inicio del archivo y termina en el primer '>': basta con los primeros bytes
+_XML_DECL_HEAD_SIZE = 256
+_ENCODING_RE = re.compile(rb"<\?xml[^>]*?encoding\s*=\s*['\"]([^'\"]*)['\"]", re.IGNORECASE)
+
 def get_xml_encoding(file_path: str, default_encoding='utf-8') -> str:
     """
     Lee los primeros bytes de un archivo para detectar el encoding especificado
@@ -8,21 +12,27 @@ def get_xml_encoding(file_path: str, default_encoding='utf-8') -> str:
     """
     try:
         with open(file_path, 'rb') as f:
-            start_of_file = f.read(1024)
+            start_of_file = f.read(_XML_DECL_HEAD_SIZE)
+    except IOError:
+        return default_encoding
+
+    return detect_xml_encoding(start_of_file, default_encoding)
+
+
+def detect_xml_encoding(content: bytes, default_encoding='utf-8') -> str:
+    """
+    Detecta el encoding declarado en la cabecera XML de un contenido ya leído,
+    para no volver a abrir el archivo solo para olfatear el encoding.
+    """
+    # La regex corre directamente sobre los bytes de la cabecera, sin copiarlos ni decodificarlos
+    match = _ENCODING_RE.search(content, 0, _XML_DECL_HEAD_SIZE)
 
-        head = start_of_file.decode('latin-1')
+    if match:
+        encoding = match.group(1).decode('latin-1').strip()
+        try:
+            codecs.lookup(encoding)
+            return encoding
+        except LookupError:
+            return default_encoding
 
-        # Expresión regular corregida.
-        match = re.search(r"<\?xml.*encoding\s*=\s*['\"](.*?)['\"]", head, re.IGNORECASE)
-        
-        if match:
-            encoding = match.group(1).strip()
-            try:
-                codecs.lookup(encoding)
-                return encoding
-            except LookupError:
-                return default_encoding
-    except (IOError, IndexError):
-        pass
-    
-    return default_encoding
\ No newline at end of file
+    return default_encoding
@@ -0,0 +1,49 @@
+import logging
+import os
+
+import pandas as pd
+import pytest
+
+from src.legacy import cli
+from src.legacy.cli import _iter_files, process_directory
+from test_sire_ventas_processor import _escribir_txt, _fila
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="requiere enlaces simbólicos")
+def test_iter_files_no_sigue_ciclos_de_symlinks(tmp_path):
+    (tmp_path / "archivo.txt").write_text("x")
+    subdir = tmp_path / "a"
+    subdir.mkdir()
+    (subdir / "interno.txt").write_text("y")
+    os.symlink(tmp_path, subdir / "loop", target_is_directory=True)
+
+    nombres = sorted(entry.name for entry in _iter_files(str(tmp_path), logging.getLogger("test")))
+
+    assert nombres == ["archivo.txt", "interno.txt"]
+
+
+def test_iter_files_registra_directorio_ilegible(tmp_path, caplog):
+    faltante = tmp_path / "no_existe"
+
+    with caplog.at_level(logging.ERROR):
+        assert list(_iter_files(str(faltante), logging.getLogger("test"))) == []
+
+    assert "no_existe" in caplog.text
+
+
+def test_process_directory_con_un_archivo_no_crea_pool(tmp_path, monkeypatch):
+    entrada = tmp_path / "entrada"
+    entrada.mkdir()
+    salida = tmp_path / "salida"
+    salida.mkdir()
+    _escribir_txt(entrada / "LE20100070970202401140100EXP2.txt", [_fila(1, "100.00", "18.00")])
+
+    def sin_pool(*args, **kwargs):
+        raise AssertionError("un solo archivo no debería arrancar procesos")
+
+    monkeypatch.setattr(cli, "create_process_pool", sin_pool)
+    process_directory(entrada, salida, logging.getLogger("test"), "csv")
+
+    reportes = list(salida.glob("resultados_sire_ventas_*.csv"))
+    assert len(reportes) == 1
+    assert len(pd.read_csv(reportes[0])) == 1
@@ -0,0 +1,57 @@
+import csv
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.db_manager import _copy_from_stdin
+
+pytest.importorskip("psycopg2")
+
+
+class _FakeCursor:
+    def __init__(self):
+        self.statement = None
+        self.body = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def copy_expert(self, statement, file):
+        self.statement = statement
+        self.body = file.read()
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.cursor_obj = _FakeCursor()
+        self.connection = self
+
+    def cursor(self):
+        return self.cursor_obj
+
+
+def test_copy_from_stdin_serializa_csv_y_arma_el_copy():
+    conn = _FakeConnection()
+    table = SimpleNamespace(schema="meta", name="stg_sire")
+    filas = [("a,b", None, 1.5), ("línea\nnueva", "", 2)]
+
+    _copy_from_stdin(table, conn, ["cui", "serie", "valor"], iter(filas))
+
+    cursor = conn.cursor_obj
+    assert cursor.statement == (
+        'COPY "meta"."stg_sire" ("cui", "serie", "valor") FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'
+    )
+    assert cursor.body == '"a,b",\\N,1.5\r\n"línea\nnueva",,2\r\n'
+    assert list(csv.reader(io.StringIO(cursor.body))) == [["a,b", "\\N", "1.5"], ["línea\nnueva", "", "2"]]
+
+
+def test_copy_from_stdin_sin_schema():
+    conn = _FakeConnection()
+
+    _copy_from_stdin(SimpleNamespace(schema=None, name="ventas"), conn, ["cui"], iter([("x",)]))
+
+    assert conn.cursor_obj.statement.startswith('COPY "ventas" ("cui") FROM STDIN')
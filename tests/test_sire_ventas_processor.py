@@ -0,0 +1,82 @@
+import logging
+import zipfile
+
+import pandas as pd
+
+from src.processors.sire_ventas_processor import SireVentasProcessor
+
+CABECERA = [
+    'Ruc', 'Razon Social', 'Periodo', 'CAR SUNAT', 'Fecha de emisión', 'Fecha Vcto/Pago', 'Tipo CP/Doc.',
+    'Serie del CDP', 'Nro CP o Doc. Nro Inicial (Rango)', 'Nro Final (Rango)', 'Tipo Doc Identidad',
+    'Nro Doc Identidad', 'Apellidos Nombres/ Razón Social', 'Valor Facturado Exportación', 'BI Gravada',
+    'Dscto BI', 'IGV / IPM', 'Dscto IGV / IPM', 'Mto Exonerado', 'Mto Inafecto', 'ISC', 'BI Grav IVAP', 'IVAP',
+    'ICBPER', 'Otros Tributos', 'Total CP', 'Moneda', 'Tipo Cambio', 'Fecha Emisión Doc Modificado',
+    'Tipo CP Modificado', 'Serie CP Modificado', 'Nro CP Modificado', 'ID Proyecto Operadores Atribución',
+    'Tipo de Nota', 'Est. Comp', 'Valor FOB Embarcado', 'Valor OP Gratuitas', 'Tipo Operación', 'DAM / CP', 'CLU',
+]
+
+
+def _fila(correlativo: int, bi_gravada: str, igv: str) -> str:
+    valores = {
+        'Ruc': '20100070970', 'Razon Social': 'EMPRESA SAC', 'Periodo': '202401',
+        'CAR SUNAT': f'2010007097001F001{correlativo:010d}',
+        'Fecha de emisión': '15/01/2024', 'Tipo CP/Doc.': '01', 'Serie del CDP': 'F001',
+        'Nro CP o Doc. Nro Inicial (Rango)': str(correlativo), 'Tipo Doc Identidad': '6',
+        'Nro Doc Identidad': '20512345678', 'Apellidos Nombres/ Razón Social': 'CLIENTE SAC',
+        'BI Gravada': bi_gravada, 'IGV / IPM': igv, 'Total CP': '118.00', 'Moneda': 'PEN',
+    }
+    return '|'.join(valores.get(col, '') for col in CABECERA)
+
+
+def _escribir_txt(ruta, filas):
+    ruta.write_bytes(('\r\n'.join(['|'.join(CABECERA), *filas]) + '\r\n').encode('utf-8'))
+    return str(ruta)
+
+
+def test_process_files_en_paralelo_coincide_con_process_file(tmp_path):
+    procesador = SireVentasProcessor(logging.getLogger('test'))
+    rutas = [
+        _escribir_txt(tmp_path / 'ventas1.txt', [_fila(1, '100.00', '18.00'), _fila(2, '50.00', '9.00')]),
+        _escribir_txt(tmp_path / 'ventas2.txt', [_fila(3, '0', '0')]),
+        _escribir_txt(tmp_path / 'ventas3.txt', []),
+    ]
+
+    resultados = procesador.process_files(rutas, max_workers=2)
+
+    assert len(resultados) == len(rutas)
+    for ruta, resultado in zip(rutas, resultados):
+        pd.testing.assert_frame_equal(resultado['sire_ventas'], procesador.process_file(ruta)['sire_ventas'])
+    assert len(resultados[0]['sire_ventas']) == 2
+
+
+def test_montos_son_float64_aunque_no_quede_ninguna_fila(tmp_path):
+    procesador = SireVentasProcessor(logging.getLogger('test'))
+    # CAR de longitud inválida: el filtro CAR descarta todas las filas antes de convertir tipos
+    fila = _fila(1, '100.00', '18.00').replace('20100070970' + '01F0010000000001', 'CAR-INVALIDO', 1)
+    ruta = _escribir_txt(tmp_path / 'ventas_sin_filas.txt', [fila])
+
+    resultado = procesador.process_file(ruta)['sire_ventas']
+
+    assert resultado.empty
+    for col in SireVentasProcessor.NUMERIC_COLUMNS:
+        if col in resultado.columns:
+            assert resultado[col].dtype == 'float64', col
+
+
+def test_zip_con_varios_txt_se_lee_igual_desde_ruta_y_desde_bytes(tmp_path):
+    procesador = SireVentasProcessor(logging.getLogger('test'))
+    miembros = {
+        'ventas1.txt': [_fila(1, '100.00', '18.00'), _fila(2, '50.00', '9.00')],
+        'ventas2.txt': [_fila(3, '10.00', '1.80')],
+        'ventas3.txt': [_fila(4, '20.00', '3.60')],
+    }
+    ruta_zip = tmp_path / 'LE20100070970202401140100EXP2.zip'
+    with zipfile.ZipFile(ruta_zip, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
+        for nombre, filas in miembros.items():
+            zip_ref.write(_escribir_txt(tmp_path / nombre, filas), nombre)
+
+    desde_ruta = procesador.process_file(str(ruta_zip))['sire_ventas']
+    desde_bytes = procesador.process_content(ruta_zip.name, ruta_zip.read_bytes())['sire_ventas']
+
+    assert sorted(desde_ruta['numero_correlativo']) == ['1', '2', '3', '4']
+    pd.testing.assert_frame_equal(desde_ruta, desde_bytes)